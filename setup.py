@@ -1,9 +1,10 @@
 """This is a setup.py script to install ShakeNBreak."""
 
+import functools
 import os
 import warnings
 
-from setuptools import find_packages, setup
+from setuptools import setup
 from setuptools.command.develop import develop
 from setuptools.command.egg_info import egg_info
 from setuptools.command.install import install
@@ -11,62 +12,97 @@ from setuptools.command.install import install
 path_to_file = os.path.dirname(os.path.abspath(__file__))
 
 
+def _font_is_up_to_date(src, dst):
+    """Check if the font file at ``dst`` matches (and is no older than) ``src``."""
+    try:
+        src_stat = os.stat(src)
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+    return src_stat.st_size == dst_stat.st_size and int(src_stat.st_mtime) <= int(dst_stat.st_mtime)
+
+
+@functools.lru_cache(maxsize=1)
+def _mpl_dirs():
+    """Get matplotlib's data and cache directories."""
+    import matplotlib as mpl
+
+    return os.path.dirname(mpl.matplotlib_fname()), mpl.get_cachedir()
+
+
 # See https://stackoverflow.com/questions/34193900/how-do-i-distribute-fonts-with-my-python-package
 def _install_custom_font():
-    """Install ShakeNBreak custom font."""
-    print("Trying to install ShakeNBreak custom font...")
+    """
+    Install ShakeNBreak custom font.
+
+    Can be skipped by setting the ``SHAKENBREAK_INSTALL_FONT`` environment
+    variable to ``0``.
+    """
+    if os.environ.get("SHAKENBREAK_INSTALL_FONT") == "0":
+        return
+    messages = ["Trying to install ShakeNBreak custom font..."]  # printed together at the end
     # Try to install custom font
     try:
-        try:
-            import os
-            import shutil
+        # Find ttf fonts first, to avoid importing matplotlib if there is nothing to install
+        fonts_dir = f"{path_to_file}/shakenbreak/"
+        with os.scandir(fonts_dir) as entries:
+            ttf_fonts = [
+                entry
+                for entry in entries
+                if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(".ttf")
+            ]
+        if not ttf_fonts:  # must be in ttf format for matplotlib
+            messages.append(f"No ttf fonts found in the {fonts_dir} directory.")
+            return
 
-            import matplotlib as mpl
-            import matplotlib.font_manager
-        except Exception:
-            print("Cannot import matplotlib!")
+        import shutil
 
         # Find where matplotlib stores its True Type fonts
-        mpl_data_dir = os.path.dirname(mpl.matplotlib_fname())
+        try:
+            mpl_data_dir, mpl_cache_dir = _mpl_dirs()
+        except ImportError:
+            messages.append("Cannot import matplotlib!")
+            raise
         mpl_fonts_dir = os.path.join(mpl_data_dir, "fonts", "ttf")
+        font_paths = {font.path: os.path.join(mpl_fonts_dir, font.name) for font in ttf_fonts}
+
+        # Skip if fonts already installed, to avoid needlessly rewriting matplotlib's font cache
+        if all(_font_is_up_to_date(old_path, new_path) for old_path, new_path in font_paths.items()):
+            messages.append("ShakeNBreak custom font already installed.")
+            return
+
+        # Only import font_manager (which loads matplotlib's font cache) once we know it's needed
+        from matplotlib import font_manager
 
         # Copy the font file to matplotlib's True Type font directory
-        fonts_dir = f"{path_to_file}/shakenbreak/"
-        ttf_fonts = [file_name for file_name in os.listdir(fonts_dir) if ".ttf" in file_name]
+        # copyfile already uses zero-copy syscalls (sendfile/fcopyfile) where available
+        copyfile = shutil.copyfile
         try:
-            for font in ttf_fonts:  # must be in ttf format for matplotlib
-                old_path = os.path.join(fonts_dir, font)
-                new_path = os.path.join(mpl_fonts_dir, font)
-                shutil.copyfile(old_path, new_path)
-                print("Copying " + old_path + " -> " + new_path)
-            if not ttf_fonts:
-                print(f"No ttf fonts found in the {fonts_dir} directory.")
+            for old_path, new_path in font_paths.items():
+                copyfile(old_path, new_path)
+                messages.append(f"Copying {old_path} -> {new_path}")
         except Exception:
             pass
 
-        # Try to delete matplotlib's fontList cache
-        mpl_cache_dir = mpl.get_cachedir()
-        mpl_cache_dir_ls = os.listdir(mpl_cache_dir)
-        for file_name in mpl_cache_dir_ls:
-            if "fontlist" in file_name.lower():
-                fontList_path = os.path.join(mpl_cache_dir, file_name)
-                if os.path.exists(fontList_path):
-                    os.remove(fontList_path)
-                    print("Deleted the matplotlib fontList cache.")
-        if not any("fontlist" in file_name.lower() for file_name in mpl_cache_dir_ls):
-            print("Couldn't find matplotlib cache, so will continue.")
-
-        # Add fonts
-        for font in ttf_fonts:
-            matplotlib.font_manager._load_fontmanager(try_read_cache=False)
-            matplotlib.font_manager.fontManager.addfont(f"{fonts_dir}/{font}")
-            print(f"Adding {font} font to matplotlib fonts.")
+        # Add fonts to the existing font manager and update its cache, rather than deleting the
+        # cache and forcing matplotlib to re-enumerate all system fonts
+        add_font = font_manager.fontManager.addfont
+        for new_path in font_paths.values():
+            add_font(new_path)
+            messages.append(f"Adding {os.path.basename(new_path)} font to matplotlib fonts.")
+        font_manager.json_dump(
+            font_manager.fontManager,
+            os.path.join(mpl_cache_dir, f"fontlist-v{font_manager.FontManager.__version__}.json"),
+        )
+        messages.append("Updated the matplotlib fontList cache.")
 
     except Exception:
         warnings.warn(
             "An issue occured while installing the custom font for ShakeNBreak. The widely available "
             "Helvetica font will be used instead."
         )
+    finally:
+        print("\n".join(messages))
 
 
 class PostInstallCommand(install):
@@ -81,7 +117,7 @@ class PostInstallCommand(install):
         """
         Performs the usual install process and then copies the True Type fonts
         that come with SnB into matplotlib's True Type font directory,
-        and deletes the matplotlib fontList.cache.
+        and adds them to the matplotlib fontList cache.
         """
         # Perform the usual install process
         install.run(self)
@@ -95,7 +131,7 @@ class PostDevelopCommand(develop):
         """
         Performs the usual install process and then copies the True Type fonts
         that come with SnB into matplotlib's True Type font directory,
-        and deletes the matplotlib fontList.cache.
+        and adds them to the matplotlib fontList cache.
         """
         develop.run(self)
         _install_custom_font()
@@ -108,120 +144,120 @@ class CustomEggInfoCommand(egg_info):
         """
         Performs the usual install process and then copies the True Type fonts
         that come with SnB into matplotlib's True Type font directory,
-        and deletes the matplotlib fontList.cache.
+        and adds them to the matplotlib fontList cache.
         """
         egg_info.run(self)
         _install_custom_font()
 
 
-with open("README.md", encoding="utf-8") as file:
-    long_description = file.read()
-
-
-setup(
-    name="shakenbreak",
-    version="3.4.2",
-    description="Package to generate and analyse distorted defect structures, in order to "
-    "identify ground-state and metastable defect configurations.",
-    long_description=long_description,
-    long_description_content_type="text/markdown",
-    author="Irea Mosquera-Lois & Seán R. Kavanagh",
-    author_email="i.mosquera-lois22@imperial.ac.uk, sean.kavanagh.19@ucl.ac.uk",
-    maintainer="Irea Mosquera-Lois & Seán R. Kavanagh",
-    maintainer_email="i.mosquera-lois22@imperial.ac.uk, sean.kavanagh.19@ucl.ac.uk",
-    url="https://shakenbreak.readthedocs.io/en/latest/index.html",
-    license="MIT",
-    license_files=("LICENSE",),
-    classifiers=[
-        "Development Status :: 5 - Production/Stable",
-        "Intended Audience :: Science/Research",
-        "License :: OSI Approved :: MIT License",
-        "Natural Language :: English",
-        "Programming Language :: Python :: 3 :: Only",
-        "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
-        "Programming Language :: Python :: 3.10",
-        "Programming Language :: Python :: 3.11",
-        "Programming Language :: Python :: 3.12",
-        "Topic :: Scientific/Engineering :: Chemistry",
-        "Topic :: Scientific/Engineering :: Physics",
-    ],
-    keywords="chemistry pymatgen dft defects structure-searching distortions symmetry-breaking",
-    packages=find_packages(),
-    python_requires=">=3.10",  # dictated by "pymatgen>=2025.5.2" requirement in doped
-    install_requires=[
-        "numpy",
-        "pymatgen",  # requirement set by doped
-        "pymatgen-analysis-defects",  # requirement set by doped
-        "matplotlib>=3.6",
-        "ase",
-        "pandas>=1.1.0",
-        "seaborn",
-        "hiphive>=1.0",  # nbr_cutoff not defined in previous versions of mc_rattle
-        "monty",
-        "click>8.0",
-        "importlib_metadata",
-        "doped>=3.1",  # for StructureMatcher_scan_stol, for super-fast structure matching
-    ],
-    extras_require={
-        "tests": [
-            "pytest>=7.1.3",
-            "pytest-mpl==0.17.0",
-        ],
-        "docs": [
-            "sphinx",
-            "sphinx-book-theme",
-            "sphinx_click",
-            "sphinx_design",
-        ],
-        "pdf": [
-            "pycairo",
+def _readme():
+    """Read the README, to use as the long description."""
+    with open(os.path.join(path_to_file, "README.md"), "rb") as file:
+        return file.read().decode("utf-8")
+
+
+if __name__ == "__main__":
+    setup(
+        name="shakenbreak",
+        version="3.4.2",
+        description="Package to generate and analyse distorted defect structures, in order to "
+        "identify ground-state and metastable defect configurations.",
+        long_description=_readme(),
+        long_description_content_type="text/markdown",
+        author="Irea Mosquera-Lois & Seán R. Kavanagh",
+        author_email="i.mosquera-lois22@imperial.ac.uk, sean.kavanagh.19@ucl.ac.uk",
+        maintainer="Irea Mosquera-Lois & Seán R. Kavanagh",
+        maintainer_email="i.mosquera-lois22@imperial.ac.uk, sean.kavanagh.19@ucl.ac.uk",
+        url="https://shakenbreak.readthedocs.io/en/latest/index.html",
+        license="MIT",
+        license_files=("LICENSE",),
+        classifiers=[
+            "Development Status :: 5 - Production/Stable",
+            "Intended Audience :: Science/Research",
+            "License :: OSI Approved :: MIT License",
+            "Natural Language :: English",
+            "Programming Language :: Python :: 3 :: Only",
+            "Programming Language :: Python :: 3",
+            "Programming Language :: Python :: 3.8",
+            "Programming Language :: Python :: 3.9",
+            "Programming Language :: Python :: 3.10",
+            "Programming Language :: Python :: 3.11",
+            "Programming Language :: Python :: 3.12",
+            "Topic :: Scientific/Engineering :: Chemistry",
+            "Topic :: Scientific/Engineering :: Physics",
         ],
-    },
-    # Specify any non-python files to be distributed with the package
-    package_data={
-        "shakenbreak": ["shakenbreak/*"],
-    },
-    include_package_data=True,
-    # Specify the custom installation class
-    zip_safe=False,
-    entry_points={
-        "console_scripts": [
-            "snb = shakenbreak.cli:snb",
-            "snb-generate = shakenbreak.cli:generate",
-            "snb-generate_all = shakenbreak.cli:generate_all",
-            "snb-run = shakenbreak.cli:run",
-            "snb-parse = shakenbreak.cli:parse",
-            "snb-analyse = shakenbreak.cli:analyse",
-            "snb-plot = shakenbreak.cli:plot",
-            "snb-regenerate = shakenbreak.cli:regenerate",
-            "snb-groundstate = shakenbreak.cli:groundstate",
-            "snb-mag = shakenbreak.cli:mag",
-            "shakenbreak = shakenbreak.cli:snb",
-            "shakenbreak-generate = shakenbreak.cli:generate",
-            "shakenbreak-generate_all = shakenbreak.cli:generate_all",
-            "shakenbreak-run = shakenbreak.cli:run",
-            "shakenbreak-parse = shakenbreak.cli:parse",
-            "shakenbreak-analyse = shakenbreak.cli:analyse",
-            "shakenbreak-plot = shakenbreak.cli:plot",
-            "shakenbreak-regenerate = shakenbreak.cli:regenerate",
-            "shakenbreak-groundstate = shakenbreak.cli:groundstate",
-            "shakenbreak-mag = shakenbreak.cli:mag",
+        keywords="chemistry pymatgen dft defects structure-searching distortions symmetry-breaking",
+        packages=["shakenbreak"],
+        python_requires=">=3.10",  # dictated by "pymatgen>=2025.5.2" requirement in doped
+        install_requires=[
+            "numpy",
+            "pymatgen",  # requirement set by doped
+            "pymatgen-analysis-defects",  # requirement set by doped
+            "matplotlib>=3.6",
+            "ase",
+            "pandas>=1.1.0",
+            "seaborn",
+            "hiphive>=1.0",  # nbr_cutoff not defined in previous versions of mc_rattle
+            "monty",
+            "click>8.0",
+            "importlib_metadata",
+            "doped>=3.1",  # for StructureMatcher_scan_stol, for super-fast structure matching
         ],
-    },
-    cmdclass={
-        "install": PostInstallCommand,
-        "develop": PostDevelopCommand,
-        "egg_info": CustomEggInfoCommand,
-    },
-    project_urls={
-        "Homepage": "https://shakenbreak.readthedocs.io/en/latest/index.html",
-        "Documentation": "https://shakenbreak.readthedocs.io/en/latest/index.html",
-        "Package": "https://pypi.org/project/shakenbreak/",
-        "Repository": "https://github.com/SMTG-Bham/shakenbreak",
-    },
-)
-
-
-_install_custom_font()
+        extras_require={
+            "tests": [
+                "pytest>=7.1.3",
+                "pytest-mpl==0.17.0",
+            ],
+            "docs": [
+                "sphinx",
+                "sphinx-book-theme",
+                "sphinx_click",
+                "sphinx_design",
+            ],
+            "pdf": [
+                "pycairo",
+            ],
+        },
+        # Specify any non-python files to be distributed with the package
+        package_data={
+            "shakenbreak": ["shakenbreak/*"],
+        },
+        include_package_data=True,
+        # Specify the custom installation class
+        zip_safe=False,
+        entry_points={
+            "console_scripts": [
+                "snb = shakenbreak.cli:snb",
+                "snb-generate = shakenbreak.cli:generate",
+                "snb-generate_all = shakenbreak.cli:generate_all",
+                "snb-run = shakenbreak.cli:run",
+                "snb-parse = shakenbreak.cli:parse",
+                "snb-analyse = shakenbreak.cli:analyse",
+                "snb-plot = shakenbreak.cli:plot",
+                "snb-regenerate = shakenbreak.cli:regenerate",
+                "snb-groundstate = shakenbreak.cli:groundstate",
+                "snb-mag = shakenbreak.cli:mag",
+                "shakenbreak = shakenbreak.cli:snb",
+                "shakenbreak-generate = shakenbreak.cli:generate",
+                "shakenbreak-generate_all = shakenbreak.cli:generate_all",
+                "shakenbreak-run = shakenbreak.cli:run",
+                "shakenbreak-parse = shakenbreak.cli:parse",
+                "shakenbreak-analyse = shakenbreak.cli:analyse",
+                "shakenbreak-plot = shakenbreak.cli:plot",
+                "shakenbreak-regenerate = shakenbreak.cli:regenerate",
+                "shakenbreak-groundstate = shakenbreak.cli:groundstate",
+                "shakenbreak-mag = shakenbreak.cli:mag",
+            ],
+        },
+        cmdclass={
+            "install": PostInstallCommand,
+            "develop": PostDevelopCommand,
+            "egg_info": CustomEggInfoCommand,
+        },
+        project_urls={
+            "Homepage": "https://shakenbreak.readthedocs.io/en/latest/index.html",
+            "Documentation": "https://shakenbreak.readthedocs.io/en/latest/index.html",
+            "Package": "https://pypi.org/project/shakenbreak/",
+            "Repository": "https://github.com/SMTG-Bham/shakenbreak",
+        },
+    )
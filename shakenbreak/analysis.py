@@ -196,7 +196,12 @@ def get_gs_distortion(defect_energies_dict: dict) -> tuple:
     return energy_diff, gs_distortion
 
 
-def _sort_data(energies_file: str, verbose: bool = True, min_e_diff: float = 0.05) -> tuple:
+def _sort_data(
+    energies_file: str,
+    verbose: bool = True,
+    min_e_diff: float = 0.05,
+    defect_energies_dict: Optional[dict] = None,
+) -> tuple:
     """
     Organize bond distortion results in a dictionary, calculate energy
     of ground-state defect structure relative to ``Unperturbed`` structure
@@ -218,6 +223,10 @@ def _sort_data(energies_file: str, verbose: bool = True, min_e_diff: float = 0.0
             defect structure, relative to the ``Unperturbed`` structure,
             to consider it as having found a new energy-lowering
             distortion. Default is 0.05 eV.
+        defect_energies_dict (:obj:`dict`):
+            Energies dictionary already parsed from ``energies_file`` (e.g.
+            returned by ``io.parse_energies()``), in which case the file is
+            not re-read. Default is None.
 
     Returns:
         defect_energies_dict (:obj:`dict`):
@@ -230,12 +239,12 @@ def _sort_data(energies_file: str, verbose: bool = True, min_e_diff: float = 0.0
         gs_distortion (:obj:`float`):
             Distortion corresponding to the minimum energy structure
     """
-    # Parse dictionary from file
-    if os.path.exists(energies_file):
+    # Parse dictionary from file, if not provided
+    if defect_energies_dict is None:
+        if not os.path.exists(energies_file):
+            warnings.warn(f"Path {energies_file} does not exist")
+            return None, None, None
         defect_energies_dict = loadfn(energies_file)
-    else:
-        warnings.warn(f"Path {energies_file} does not exist")
-        return None, None, None
     if defect_energies_dict == {"distortions": {}}:  # no parsed data
         warnings.warn(f"No data parsed from {energies_file}, returning None")
         return None, None, None
@@ -479,6 +488,7 @@ def get_energies(
     output_path: str = ".",
     units: str = "eV",
     verbose: bool = True,
+    defect_energies_dict: Optional[dict] = None,
 ) -> dict:
     """
     Parse final energies for each bond distortion and store them in a
@@ -501,6 +511,10 @@ def get_energies(
             Whether to print information about energy lowering
             distortions, if found.
             (Default: True)
+        defect_energies_dict (:obj:`dict`):
+            Energies dictionary already parsed for ``defect_species`` (e.g.
+            returned by ``io.parse_energies()``), in which case the energies
+            file is not re-read. Default is None.
 
     Returns:
         :obj:`dict`:
@@ -509,7 +523,9 @@ def get_energies(
     energy_file_path = f"{output_path}/{defect_species}/{defect_species}.yaml"
     if not os.path.isfile(energy_file_path):
         raise FileNotFoundError(f"File {energy_file_path} not found!")
-    defect_energies_dict, _e_diff, gs_distortion = _sort_data(energy_file_path, verbose=verbose)
+    defect_energies_dict, _e_diff, gs_distortion = _sort_data(
+        energy_file_path, verbose=verbose, defect_energies_dict=defect_energies_dict
+    )
     if "Unperturbed" in defect_energies_dict:
         for distortion, energy in defect_energies_dict["distortions"].items():
             defect_energies_dict["distortions"][distortion] = energy - defect_energies_dict["Unperturbed"]
@@ -1,39 +1,267 @@
 """ShakeNBreak command-line-interface (CLI)."""
 
 import contextlib
-import fnmatch
+import mmap
 import os
+import re
+import shlex
 import sys
 import warnings
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from copy import deepcopy
+from functools import lru_cache
 from subprocess import call
+from typing import Optional
 
 import click
-from doped.core import guess_and_set_oxi_states_with_timeout
-from doped.generation import get_defect_name_from_entry
-from doped.utils.parsing import get_outcar
-from doped.utils.plotting import format_defect_name
 
-# Monty and pymatgen
-from monty.serialization import dumpfn, loadfn
-from pymatgen.core.structure import Structure
-from pymatgen.io.vasp.inputs import Incar
+# Heavier dependencies (doped, pymatgen, monty and the ShakeNBreak modules which import them) are
+# imported within the commands that use them, to keep CLI startup (and e.g. ``snb --help``) fast
 
-# ShakeNBreak
-from shakenbreak import analysis, energy_lowering_distortions, input, io, plotting
+
+_DISTORTION_PREFIXES = ("Rattled", "Unperturbed", "Bond_Distortion", "Dimer")
+_DISTORTION_RE = re.compile("|".join(_DISTORTION_PREFIXES))  # matches the prefixes anywhere in the name
 
 
 def _parse_defect_dirs(path) -> list:
     """Parse defect directories present in the specified path."""
-    return [
-        dir
-        for dir in os.listdir(path)
-        if os.path.isdir(f"{path}/{dir}")
-        and any(
-            fnmatch.filter(os.listdir(f"{path}/{dir}"), f"{dist}*")
-            for dist in ["Rattled", "Unperturbed", "Bond_Distortion", "Dimer"]
-        )  # only parse defect directories that contain distortion folders
-    ]
+    defect_dirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            with os.scandir(entry.path) as sub_entries:
+                # only parse defect directories that contain distortion folders
+                if any(sub_entry.name.startswith(_DISTORTION_PREFIXES) for sub_entry in sub_entries):
+                    defect_dirs.append(entry.name)
+    return defect_dirs
+
+
+def _format_defect_name_or_none(defect: str) -> Optional[str]:
+    """
+    Get the formatted name of ``defect`` (with ``doped``'s ``format_defect_name``,
+    also trying with a ``_0`` charge suffix), or None if not recognised as a
+    defect name.
+    """
+    from doped.utils.plotting import format_defect_name
+
+    try:
+        return format_defect_name(defect, include_site_info_in_name=False)
+    except Exception:
+        with contextlib.suppress(Exception):
+            return format_defect_name(f"{defect}_0", include_site_info_in_name=False)
+    return None
+
+
+def _get_defect_parent_dir(defect: str, path: str) -> Optional[str]:
+    """
+    Get the directory containing the ``defect`` folder, accounting for
+    ``path`` being the defect folder itself (e.g. when running from within
+    it). Defect folder names with ``'+'`` removed (old name format) are also
+    checked for. Returns None if the ``defect`` folder could not be found.
+    """
+    candidate_paths = [path]
+    if defect == os.path.basename(os.path.normpath(path)):  # defect at end of path, so try parent first
+        candidate_paths.insert(0, os.path.dirname(os.path.normpath(path)))
+    for candidate_path in candidate_paths:
+        if any(
+            os.path.isdir(os.path.join(candidate_path, name)) for name in {defect, defect.replace("+", "")}
+        ):
+            return candidate_path
+
+    return None
+
+
+def _parse_energies_of_defects(
+    defect_dirs: list, path: str, code: str, verbose: bool = False, return_energies: bool = False
+) -> list:
+    """
+    Parse the energies of the distortions for each defect in ``defect_dirs``
+    with ``io.parse_energies``, using a thread pool to overlap the (I/O-bound)
+    output file reads of different defects.
+
+    Returns:
+        List of the ``io.parse_energies`` outputs (energies file paths, or tuples
+        of energies file paths and energies dictionaries if ``return_energies``),
+        in the order of ``defect_dirs``.
+    """
+    from shakenbreak import io
+
+    def _parse_energies(defect):
+        return io.parse_energies(defect, path, code, verbose=verbose, return_energies=return_energies)
+
+    if len(defect_dirs) <= 1:
+        return [_parse_energies(defect) for defect in defect_dirs]
+    with ThreadPoolExecutor(max_workers=min(32, len(defect_dirs))) as executor:
+        return list(executor.map(_parse_energies, defect_dirs))
+
+
+# Valid settings (in config files) for ``snb-generate`` and ``snb-generate_all``:
+_GENERATE_VALID_ARGS = frozenset(
+    {
+        "defect",
+        "bulk",
+        "charge",
+        "min_charge",
+        "max_charge",
+        "padding",
+        "charges",
+        "defect_index",
+        "defect_coords",
+        "code",
+        "name",
+        "config",
+        "input_file",
+        "verbose",
+        "oxidation_states",
+        "dict_number_electrons_user",
+        "distortion_increment",
+        "bond_distortions",
+        "local_rattle",
+        "distorted_elements",
+        "stdev",
+        "d_min",
+        "n_iter",
+        "active_atoms",
+        "nbr_cutoff",
+        "width",
+        "max_attempts",
+        "max_disp",
+        "seed",
+    }
+)
+
+_GENERATE_ALL_VALID_ARGS = frozenset(
+    {
+        "defects",
+        "bulk",
+        "structure_file",
+        "code",
+        "config",
+        "input_file",
+        "verbose",
+        "oxidation_states",
+        "charges",
+        "charge",
+        "padding",
+        "dict_number_electrons_user",
+        "distortion_increment",
+        "bond_distortions",
+        "local_rattle",
+        "distorted_elements",
+        "stdev",
+        "d_min",
+        "n_iter",
+        "active_atoms",
+        "nbr_cutoff",
+        "width",
+        "max_attempts",
+        "max_disp",
+        "seed",
+    }
+)
+
+_CODE_WRITERS = {  # ``Distortions`` method to write input files for each (lowercase) code name
+    "vasp": "write_vasp_files",
+    "cp2k": "write_cp2k_files",
+    "espresso": "write_espresso_files",
+    "quantum_espresso": "write_espresso_files",
+    "quantum-espresso": "write_espresso_files",
+    "quantumespresso": "write_espresso_files",
+    "castep": "write_castep_files",
+    "fhi-aims": "write_fhi_aims_files",
+    "fhi_aims": "write_fhi_aims_files",
+    "fhiaims": "write_fhi_aims_files",
+}
+
+
+@lru_cache(maxsize=8)
+def _loadfn_by_mtime(path: str, mtime_ns: int):
+    """Load file with ``loadfn``, cached by path and modification time."""
+    from monty.serialization import loadfn
+
+    return loadfn(path)
+
+
+def _cached_loadfn(path) -> dict:
+    """
+    Load a (``yaml``) config file, only parsing it once per session (unless
+    the file is modified), as it is read both when setting the CLI options
+    and within the command itself. Returns a copy, as the commands modify
+    the loaded settings.
+    """
+    return deepcopy(_loadfn_by_mtime(os.path.abspath(path), os.stat(path).st_mtime_ns))
+
+
+@lru_cache(maxsize=8)
+def _get_structure_file_regex(structure_file: str = "POSCAR") -> re.Pattern:
+    """Get compiled regex matching structure file names/extensions in defect file names."""
+    return re.compile("|".join(re.escape(substring) for substring in ("cif", "POSCAR", structure_file)))
+
+
+def _fmt_site(site) -> str:
+    """Format site species and fractional coordinates, for verbose output."""
+    frac_coords = site._frac_coords
+    return f"{site.species_string} at [{frac_coords[0]:.3f}, {frac_coords[1]:.3f}, {frac_coords[2]:.3f}]"
+
+
+def _scrub_user_settings(user_settings: dict, func_args, valid_args) -> None:
+    """
+    Remove keys from ``user_settings`` (parsed from the config file) which
+    were set as command options (as these take precedence) or which are not
+    valid settings.
+    """
+    for key in (user_settings.keys() & func_args) | (user_settings.keys() - valid_args):
+        del user_settings[key]
+
+
+def _write_distortion_files(
+    Dist,
+    code: str,
+    input_file=None,
+    user_potcar_settings=None,
+    pseudopotentials=None,
+    verbose=None,
+):
+    """
+    Write the relaxation input files for the distorted defects in ``Dist``
+    (``input.Distortions``), for the specified ``code``.
+
+    Returns:
+        Tuple of the distorted defects dictionary and the distortion metadata.
+    """
+    code_lower = code.lower()
+    if code_lower not in _CODE_WRITERS:
+        raise ValueError(
+            f"Unrecognised code '{code}'. Options: 'VASP', 'CP2K', 'espresso', 'CASTEP', 'FHI-aims'."
+        )
+    writer_kwargs = {"verbose": verbose}
+    if code_lower == "vasp":
+        if input_file:
+            from pymatgen.io.vasp.inputs import Incar
+
+            incar = Incar.from_file(input_file)
+            user_incar_settings = incar.as_dict()
+            user_incar_settings.pop("@class", None)
+            user_incar_settings.pop("@module", None)
+            if not user_incar_settings:
+                warnings.warn(
+                    f"Input file {input_file} specified but no valid INCAR tags found. "
+                    f"Should be in the format of VASP INCAR file."
+                )
+        else:
+            user_incar_settings = None
+        writer_kwargs.update(
+            user_potcar_settings=user_potcar_settings,
+            user_incar_settings=user_incar_settings,
+        )
+    else:
+        if input_file:
+            writer_kwargs["input_file"] = input_file
+        if _CODE_WRITERS[code_lower] == "write_espresso_files":
+            writer_kwargs["pseudopotentials"] = pseudopotentials
+    return getattr(Dist, _CODE_WRITERS[code_lower])(**writer_kwargs)
 
 
 def CommandWithConfigFile(
@@ -51,12 +279,13 @@ def CommandWithConfigFile(
         def invoke(self, ctx):
             config_file = ctx.params[config_file_param_name]
             if config_file is not None:
-                config_data = loadfn(config_file)
-                for param, _val in ctx.params.items():
-                    if (
-                        ctx.get_parameter_source(param) == click.core.ParameterSource.DEFAULT
-                        and param in config_data
-                    ):
+                # read-only here, so no need to copy the cached config (as in ``_cached_loadfn``)
+                config_data = _loadfn_by_mtime(
+                    os.path.abspath(config_file), os.stat(config_file).st_mtime_ns
+                )
+                default_source = click.core.ParameterSource.DEFAULT
+                for param in config_data.keys() & ctx.params.keys():
+                    if ctx.get_parameter_source(param) == default_source:
                         ctx.params[param] = config_data[param]
             return super().invoke(ctx)
 
@@ -66,6 +295,33 @@ def CommandWithConfigFile(
 # CLI Commands:
 CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
 
+# Options shared (with identical settings) between the parse/analyse/plot commands:
+_defect_option = click.option(
+    "--defect",
+    "-d",
+    help="Name of defect species (folder) to analyse and plot (e.g. 'vac_1_Cd_0'), if run from "
+    "top-level directory or above. Default is current directory name (assumes running from "
+    "within defect folder).",
+    type=str,
+    default=None,
+)
+_defects_path_option = click.option(
+    "--path",
+    "-p",
+    help="Path to the top-level directory containing the defect folder(s). "
+    "Defaults to current directory.",
+    type=click.Path(exists=True, dir_okay=True),
+    default=".",
+)
+_code_option = click.option(
+    "--code",
+    help="Code used to run the geometry optimisations. "
+    "Options: 'vasp', 'cp2k', 'espresso', 'castep', 'fhi-aims'.",
+    type=str,
+    default="vasp",
+    show_default=True,
+)
+
 
 @click.group("snb", context_settings=CONTEXT_SETTINGS, no_args_is_help=True)
 def snb():
@@ -191,53 +447,21 @@ def generate(
     Generate the trial distortions and input files for structure-searching
     for a given defect.
     """
-    user_settings = loadfn(config) if config is not None else {}
+    from doped.generation import get_defect_name_from_entry
+    from monty.serialization import dumpfn
+    from pymatgen.core.structure import Structure
+
+    from shakenbreak import input
+
+    user_settings = _cached_loadfn(config) if config is not None else {}
     # Parse POTCARs/pseudopotentials from config file, if specified
     user_potcar_functional = user_settings.pop("POTCAR_FUNCTIONAL", "PBE")
     user_potcar_settings = user_settings.pop("POTCAR", None)
     pseudopotentials = user_settings.pop("pseudopotentials", None)
 
-    func_args = list(locals().keys())
     if user_settings:
-        valid_args = [
-            "defect",
-            "bulk",
-            "charge",
-            "min_charge",
-            "max_charge",
-            "padding",
-            "charges",
-            "defect_index",
-            "defect_coords",
-            "code",
-            "name",
-            "config",
-            "input_file",
-            "verbose",
-            "oxidation_states",
-            "dict_number_electrons_user",
-            "distortion_increment",
-            "bond_distortions",
-            "local_rattle",
-            "distorted_elements",
-            "stdev",
-            "d_min",
-            "n_iter",
-            "active_atoms",
-            "nbr_cutoff",
-            "width",
-            "max_attempts",
-            "max_disp",
-            "seed",
-        ]
-        for key in func_args:
-            if key in user_settings:
-                user_settings.pop(key, None)
-
-        for key in list(user_settings.keys()):
-            # remove non-sense keys from user_settings
-            if key not in valid_args:
-                user_settings.pop(key)
+        func_args = list(locals().keys())
+        _scrub_user_settings(user_settings, func_args, _GENERATE_VALID_ARGS)
 
     defect_struct = Structure.from_file(defect)
     bulk_struct = Structure.from_file(bulk)
@@ -251,11 +475,7 @@ def generate(
         defect_coords=defect_coords,
     )
     if verbose is not False and defect_index is None and defect_coords is None:  # medium level verbosity
-        site = defect_object.site
-        site_info = (
-            f"{site.species_string} at [{site._frac_coords[0]:.3f},"
-            f" {site._frac_coords[1]:.3f}, {site._frac_coords[2]:.3f}]"
-        )
+        site_info = _fmt_site(defect_object.site)
         click.echo(
             f"Auto site-matching identified {defect} to be type {defect_object.as_dict()['@class']} with "
             f"site {site_info}"
@@ -271,10 +491,9 @@ def generate(
         if max_charge is None or min_charge is None:
             raise ValueError("If using min/max defect charge, both options must be set!")
 
-        charge_lims = [min_charge, max_charge]
-        charges = list(
-            range(min(charge_lims), max(charge_lims) + 1)
-        )  # just in case user mixes min and max because of different signs ("+1 to -3" etc)
+        # sort just in case user mixes min and max because of different signs ("+1 to -3" etc)
+        lowest_charge, highest_charge = sorted((min_charge, max_charge))
+        charges = list(range(lowest_charge, highest_charge + 1))
         defect_object.user_charges = charges  # Update charge states
 
     if user_settings and "charges" in user_settings:
@@ -308,70 +527,14 @@ def generate(
         },
         **user_settings,
     )
-    if code.lower() == "vasp":
-        if input_file:
-            incar = Incar.from_file(input_file)
-            user_incar_settings = incar.as_dict()
-            [user_incar_settings.pop(key, None) for key in ["@class", "@module"]]
-            if not user_incar_settings:
-                warnings.warn(
-                    f"Input file {input_file} specified but no valid INCAR tags found. "
-                    f"Should be in the format of VASP INCAR file."
-                )
-        else:
-            user_incar_settings = None
-        distorted_defects_dict, distortion_metadata = Dist.write_vasp_files(
-            verbose=verbose,
-            user_potcar_settings=user_potcar_settings,
-            user_incar_settings=user_incar_settings,
-        )
-    elif code.lower() == "cp2k":
-        if input_file:
-            distorted_defects_dict, distortion_metadata = Dist.write_cp2k_files(
-                verbose=verbose,
-                input_file=input_file,
-            )
-        else:
-            distorted_defects_dict, distortion_metadata = Dist.write_cp2k_files(
-                verbose=verbose,
-            )
-    elif code.lower() in [
-        "espresso",
-        "quantum_espresso",
-        "quantum-espresso",
-        "quantumespresso",
-    ]:
-        if input_file:
-            distorted_defects_dict, distortion_metadata = Dist.write_espresso_files(
-                verbose=verbose,
-                pseudopotentials=pseudopotentials,
-                input_file=input_file,
-            )
-        else:
-            distorted_defects_dict, distortion_metadata = Dist.write_espresso_files(
-                verbose=verbose,
-                pseudopotentials=pseudopotentials,
-            )
-    elif code.lower() == "castep":
-        if input_file:
-            distorted_defects_dict, distortion_metadata = Dist.write_castep_files(
-                verbose=verbose,
-                input_file=input_file,
-            )
-        else:
-            distorted_defects_dict, distortion_metadata = Dist.write_castep_files(
-                verbose=verbose,
-            )
-    elif code.lower() in ["fhi-aims", "fhi_aims", "fhiaims"]:
-        if input_file:
-            distorted_defects_dict, distortion_metadata = Dist.write_fhi_aims_files(
-                verbose=verbose,
-                input_file=input_file,
-            )
-        else:
-            distorted_defects_dict, distortion_metadata = Dist.write_fhi_aims_files(
-                verbose=verbose,
-            )
+    _write_distortion_files(
+        Dist,
+        code=code,
+        input_file=input_file,
+        user_potcar_settings=user_potcar_settings,
+        pseudopotentials=pseudopotentials,
+        verbose=verbose,
+    )
     # Save Defect objects to file
     dumpfn(defect_object, "./parsed_defects_dict.json")
 
@@ -461,6 +624,12 @@ def generate_all(
     Generate the trial distortions and input files for structure-searching
     for all defects in a given directory.
     """
+    from doped.core import guess_and_set_oxi_states_with_timeout
+    from monty.serialization import dumpfn
+    from pymatgen.core.structure import Structure
+
+    from shakenbreak import input
+
     bulk_struct = Structure.from_file(bulk)
     # try parsing the bulk oxidation states first, for later assigning defect "oxi_state"s (i.e.
     # fully ionised charge states):
@@ -470,17 +639,12 @@ def generate_all(
         bulk_struct = bulk_struct_w_oxi
         _bulk_oxi_states = {el.symbol: el.oxi_state for el in bulk_struct.composition.elements}
 
-    defects_dirs = os.listdir(defects)
     if config is not None:
         # In the config file, user can specify index/frac_coords and charges for each defect
         # This way they also provide the names, that should match either the defect folder names
         # or the defect file names (if they are not organised in folders)
-        user_settings = loadfn(config)
-        if user_settings.get("defects"):
-            defect_settings = deepcopy(user_settings["defects"])
-            user_settings.pop("defects", None)
-        else:
-            defect_settings = {}
+        user_settings = _cached_loadfn(config)
+        defect_settings = user_settings.pop("defects", None) or {}
     else:
         defect_settings, user_settings = {}, {}
 
@@ -489,55 +653,18 @@ def generate_all(
     user_potcar_settings = user_settings.pop("POTCAR", None)
     pseudopotentials = user_settings.pop("pseudopotentials", None)
 
-    func_args = list(locals().keys())
     # Specified options take precedence over the ones in the config file
     if user_settings:
-        valid_args = [
-            "defects",
-            "bulk",
-            "structure_file",
-            "code",
-            "config",
-            "input_file",
-            "verbose",
-            "oxidation_states",
-            "charges",
-            "charge",
-            "padding",
-            "dict_number_electrons_user",
-            "distortion_increment",
-            "bond_distortions",
-            "local_rattle",
-            "distorted_elements",
-            "stdev",
-            "d_min",
-            "n_iter",
-            "active_atoms",
-            "nbr_cutoff",
-            "width",
-            "max_attempts",
-            "max_disp",
-            "seed",
-        ]
-        for key in func_args:
-            if key in user_settings:
-                user_settings.pop(key, None)
-
-        for key in list(user_settings.keys()):
-            # remove non-sense keys from user_settings
-            if key not in valid_args:
-                user_settings.pop(key)
+        func_args = list(locals().keys())
+        _scrub_user_settings(user_settings, func_args, _GENERATE_ALL_VALID_ARGS)
 
     def parse_defect_name(defect, defect_settings, structure_file="POSCAR"):
         """Parse defect name from file name."""
         defect_name = None
         # if user included cif/POSCAR as part of the defect structure name, remove it
-        for substring in ("cif", "POSCAR", structure_file):
-            if defect != substring:
-                defect = defect.replace(substring, "")
-        for symbol in ("-", "_", "."):
-            if defect.endswith(symbol):  # trailing characters
-                defect = defect[:-1]
+        if defect not in {"cif", "POSCAR", structure_file}:
+            defect = _get_structure_file_regex(structure_file).sub("", defect)
+        defect = defect.rstrip("-_.")  # trailing characters
         # Check if defect specified in config file
         if defect_settings:
             defect_names = defect_settings.keys()
@@ -548,16 +675,10 @@ def generate_all(
                     f"Defect {defect} not found in config file {config}. "
                     f"Will parse defect name from folders/files."
                 )
-        if not defect_name:
-            # if user didn't specify defect names in config file,
-            # check if defect filename is recognised
-            try:
-                defect_name = format_defect_name(defect, include_site_info_in_name=False)
-            except Exception:
-                with contextlib.suppress(Exception):
-                    defect_name = format_defect_name(f"{defect}_0", include_site_info_in_name=False)
-            if defect_name:
-                defect_name = defect
+        # if user didn't specify defect names in config file,
+        # check if defect filename is recognised
+        if not defect_name and _format_defect_name_or_none(defect):
+            defect_name = defect
 
         return defect_name
 
@@ -581,73 +702,74 @@ def generate_all(
         return None, None
 
     defect_entries = []
-    for defect in defects_dirs:  # file or directory
-        if os.path.isfile(f"{defects}/{defect}"):
-            try:  # try to parse structure from it
-                defect_struct = Structure.from_file(f"{defects}/{defect}")
-                defect_name = parse_defect_name(defect, defect_settings)  # None if not recognised
-
-            except Exception:
-                continue
+    with os.scandir(defects) as defects_dir_entries:
+        for entry in defects_dir_entries:  # file or directory
+            defect = entry.name
+            if entry.is_file():
+                try:  # try to parse structure from it
+                    defect_struct = Structure.from_file(entry.path)
+                    defect_name = parse_defect_name(defect, defect_settings)  # None if not recognised
+
+                except Exception:
+                    continue
 
-        elif os.path.isdir(f"{defects}/{defect}"):
-            if (
-                len(os.listdir(f"{defects}/{defect}")) == 1
-            ):  # if only 1 file in directory, assume it's the defect structure
-                defect_file = os.listdir(f"{defects}/{defect}")[0]
-            else:
-                poss_defect_files = [  # check for POSCAR and cif by default
-                    file.lower()
-                    for file in os.listdir(f"{defects}/{defect}")
-                    if structure_file.lower() in file.lower()
-                    or ("cif" in file and "bulk" not in file.lower())
-                ]
-                if len(poss_defect_files) == 1:
-                    defect_file = poss_defect_files[0]
+            elif entry.is_dir():
+                defect_dir_files = os.listdir(entry.path)
+                # if only 1 file in directory, assume it's the defect structure
+                if len(defect_dir_files) == 1:
+                    defect_file = defect_dir_files[0]
                 else:
-                    warnings.warn(
-                        f"Multiple structure files found in {defects}/{defect}, "
-                        f"cannot uniquely determine determine which is the defect, "
-                        f"skipping."
-                    )
-                    continue
-            if defect_file:
-                defect_struct = Structure.from_file(os.path.join(defects, defect, defect_file))
-                defect_name = parse_defect_name(defect, defect_settings)
-        else:
-            warnings.warn(f"Could not parse {defects}/{defect} as a defect, skipping.")
-            continue
+                    structure_file_lower = structure_file.lower()
+                    defect_file = None
+                    for file in defect_dir_files:  # check for POSCAR and cif by default
+                        file_lower = file.lower()
+                        if structure_file_lower in file_lower or (
+                            "cif" in file_lower and "bulk" not in file_lower
+                        ):
+                            if defect_file is not None:  # second match, so can stop checking
+                                defect_file = None
+                                break
+                            defect_file = file
+                    if defect_file is None:
+                        warnings.warn(
+                            f"Multiple structure files found in {entry.path}, "
+                            f"cannot uniquely determine determine which is the defect, "
+                            f"skipping."
+                        )
+                        continue
+                if defect_file:
+                    defect_struct = Structure.from_file(os.path.join(entry.path, defect_file))
+                    defect_name = parse_defect_name(defect, defect_settings)
+            else:
+                warnings.warn(f"Could not parse {entry.path} as a defect, skipping.")
+                continue
 
-        # Check if indices are provided in config file
-        defect_index, defect_coords = parse_defect_position(defect_name, defect_settings)
-        defect_object = input.identify_defect(
-            defect_structure=defect_struct,
-            bulk_structure=bulk_struct,
-            defect_index=defect_index,
-            defect_coords=defect_coords,
-            oxi_state=(
-                None if _bulk_oxi_states else "Undetermined"
-            ),  # guess if bulk_oxi, else "Undetermined"
-        )
-        if verbose is not False:  # medium level verbosity
-            site = defect_object.site
-            site_info = (
-                f"{site.species_string} at [{site._frac_coords[0]:.3f},"
-                f" {site._frac_coords[1]:.3f}, {site._frac_coords[2]:.3f}]"
-            )
-            click.echo(
-                f"Auto site-matching identified {defect} to be type {defect_object.as_dict()['@class']} "
-                f"with site {site_info}"
+            # Check if indices are provided in config file
+            defect_index, defect_coords = parse_defect_position(defect_name, defect_settings)
+            defect_object = input.identify_defect(
+                defect_structure=defect_struct,
+                bulk_structure=bulk_struct,
+                defect_index=defect_index,
+                defect_coords=defect_coords,
+                oxi_state=(
+                    None if _bulk_oxi_states else "Undetermined"
+                ),  # guess if bulk_oxi, else "Undetermined"
             )
+            if verbose is not False:  # medium level verbosity
+                site_info = _fmt_site(defect_object.site)
+                click.echo(
+                    f"Auto site-matching identified {defect} to be type "
+                    f"{defect_object.as_dict()['@class']} with site {site_info}"
+                )
 
-        # Update charges if specified in config file
-        charges = parse_defect_charges(defect_name or defect_object.name, defect_settings)
-        defect_object.user_charges = charges
+            # Update charges if specified in config file
+            charges = parse_defect_charges(defect_name or defect_object.name, defect_settings)
+            defect_object.user_charges = charges
 
-        # Add defect entry to full defects_dict
-        # If charges were not specified by user, set them using padding
-        for charge in defect_object.get_charge_states(padding=padding):
-            defect_entries.append(input._get_defect_entry_from_defect(defect_object, charge))
+            # Add defect entry to full defects_dict
+            # If charges were not specified by user, set them using padding
+            for charge in defect_object.get_charge_states(padding=padding):
+                defect_entries.append(input._get_defect_entry_from_defect(defect_object, charge))
 
     defects_dict = input._get_defects_dict_from_defects_entries(defect_entries)
     # if user_charges not set for all defects, print info about how charge states will be
@@ -659,73 +781,17 @@ def generate_all(
         )
     # Apply distortions and write input files
     Dist = input.Distortions(defects_dict, **user_settings)
-    if code.lower() == "vasp":
-        if input_file:
-            incar = Incar.from_file(input_file)
-            user_incar_settings = incar.as_dict()
-            [user_incar_settings.pop(key, None) for key in ["@class", "@module"]]
-            if user_incar_settings == {}:
-                warnings.warn(
-                    f"Input file {input_file} specified but no valid INCAR tags found. "
-                    f"Should be in the format of VASP INCAR file."
-                )
-        else:
-            user_incar_settings = None
-        distorted_defects_dict, distortion_metadata = Dist.write_vasp_files(
-            verbose=verbose,
-            user_potcar_settings=user_potcar_settings,
-            user_incar_settings=user_incar_settings,
-        )
-    elif code.lower() == "cp2k":
-        if input_file:
-            distorted_defects_dict, distortion_metadata = Dist.write_cp2k_files(
-                verbose=verbose,
-                input_file=input_file,
-            )
-        else:
-            distorted_defects_dict, distortion_metadata = Dist.write_cp2k_files(
-                verbose=verbose,
-            )
-    elif code.lower() in [
-        "espresso",
-        "quantum_espresso",
-        "quantum-espresso",
-        "quantumespresso",
-    ]:
-        if input_file:
-            distorted_defects_dict, distortion_metadata = Dist.write_espresso_files(
-                verbose=verbose,
-                pseudopotentials=pseudopotentials,
-                input_file=input_file,
-            )
-        else:
-            distorted_defects_dict, distortion_metadata = Dist.write_espresso_files(
-                verbose=verbose,
-                pseudopotentials=pseudopotentials,
-            )
-    elif code.lower() == "castep":
-        if input_file:
-            distorted_defects_dict, distortion_metadata = Dist.write_castep_files(
-                verbose=verbose,
-                input_file=input_file,
-            )
-        else:
-            distorted_defects_dict, distortion_metadata = Dist.write_castep_files(
-                verbose=verbose,
-            )
-    elif code.lower() in ["fhi-aims", "fhi_aims", "fhiaims"]:
-        if input_file:
-            distorted_defects_dict, distortion_metadata = Dist.write_fhi_aims_files(
-                verbose=verbose,
-                input_file=input_file,
-            )
-        else:
-            distorted_defects_dict, distortion_metadata = Dist.write_fhi_aims_files(
-                verbose=verbose,
-            )
+    _write_distortion_files(
+        Dist,
+        code=code,
+        input_file=input_file,
+        user_potcar_settings=user_potcar_settings,
+        pseudopotentials=pseudopotentials,
+        verbose=verbose,
+    )
 
-        # Dump dict with parsed defects to json
-        dumpfn(defects_dict, "./parsed_defects_dict.json")
+    # Dump dict with parsed defects to json
+    dumpfn(defects_dict, "./parsed_defects_dict.json")
 
 
 @snb.command(
@@ -792,11 +858,16 @@ def run(submit_command, job_script, job_name_option, verbose):
     elif job_name_option is None:
         job_name_option = "-N"
 
-    call(
-        f"{os.path.dirname(__file__)}/SnB_run.sh {optional_flags} {submit_command} {job_script} "
-        f"{job_name_option}",
-        shell=True,
-    )
+    # run script directly (rather than through a shell), so no shell startup or argument quoting issues.
+    # Options can include whitespace (e.g. click passes "-s echo", given as one argument, as the value
+    # " echo"), so split them with shlex.split, reproducing the shell word-splitting of the old
+    # shell=True call:
+    script_args = [f"{os.path.dirname(__file__)}/SnB_run.sh"]
+    if optional_flags:
+        script_args.append(optional_flags)
+    for option in (submit_command, job_script, job_name_option):
+        script_args.extend(shlex.split(option))
+    call(script_args)
 
 
 @snb.command(
@@ -821,14 +892,7 @@ def run(submit_command, job_script, job_name_option, verbose):
     type=click.Path(exists=True, dir_okay=True),
     default=".",
 )
-@click.option(
-    "--code",
-    help="Code used to run the geometry optimisations. "
-    "Options: 'vasp', 'cp2k', 'espresso', 'castep', 'fhi-aims'.",
-    type=str,
-    default="vasp",
-    show_default=True,
-)
+@_code_option
 @click.option(
     "--verbose",
     "-v",
@@ -845,21 +909,23 @@ def parse(defect, path, code, verbose):
     Can be run within a single defect folder, or in the top-level directory (either
     specifying ``defect`` or looping through all defect folders).
     """
+    from shakenbreak import io
+
     if defect:
         _ = io.parse_energies(defect, path, code, verbose=verbose)
     elif (
-        _running_in_defect_dir(
+        path == "."  # only check for distortion folders in cwd if path not set
+        and _running_in_defect_dir(
             path=path,
             warning_substring="calculations will only be parsed for the distortion folders in this "
             "directory.",
         )
-        and path == "."
     ):
         # assume current directory is the defect folder
         try:
             cwd = os.getcwd()
-            defect = cwd.split("/")[-1]
-            path = cwd.rsplit("/", 1)[0]
+            defect = os.path.basename(cwd)
+            path = os.path.dirname(cwd)
             _ = io.parse_energies(defect, path, code, verbose=verbose)
         except Exception as exc:
             raise Exception(
@@ -871,7 +937,7 @@ def parse(defect, path, code, verbose):
 
     else:
         defect_dirs = _parse_defect_dirs(path)
-        _ = [io.parse_energies(defect, path, code, verbose=verbose) for defect in defect_dirs]
+        _ = _parse_energies_of_defects(defect_dirs, path, code, verbose=verbose)
 
 
 @snb.command(
@@ -879,31 +945,9 @@ def parse(defect, path, code, verbose):
     context_settings=CONTEXT_SETTINGS,
     no_args_is_help=False,  # can be run within defect directory with no options/arguments set
 )
-@click.option(
-    "--defect",
-    "-d",
-    help="Name of defect species (folder) to analyse and plot (e.g. 'vac_1_Cd_0'), if run from "
-    "top-level directory or above. Default is current directory name (assumes running from "
-    "within defect folder).",
-    type=str,
-    default=None,
-)
-@click.option(
-    "--path",
-    "-p",
-    help="Path to the top-level directory containing the defect folder(s). "
-    "Defaults to current directory.",
-    type=click.Path(exists=True, dir_okay=True),
-    default=".",
-)
-@click.option(
-    "--code",
-    help="Code used to run the geometry optimisations. "
-    "Options: 'vasp', 'cp2k', 'espresso', 'castep', 'fhi-aims'.",
-    type=str,
-    default="vasp",
-    show_default=True,
-)
+@_defect_option
+@_defects_path_option
+@_code_option
 @click.option(
     "--ref_struct",
     "-ref",
@@ -930,18 +974,19 @@ def analyse(defect, path, code, ref_struct, verbose):
     Can be run within a single defect folder, or in the top-level directory (either
     specifying ``defect`` or looping through all defect folders).
     """
+    from shakenbreak import analysis, io
 
     def analyse_single_defect(defect, path, code, ref_struct, verbose):
-        if not os.path.exists(f"{path}/{defect}") or not os.path.exists(path):
+        if not os.path.exists(f"{path}/{defect}"):  # also False if path doesn't exist
             orig_defect_name = defect
             defect = defect.replace("+", "")  # try with old name format
 
-            if not os.path.exists(f"{path}/{defect}") or not os.path.exists(path):
+            if not os.path.exists(f"{path}/{defect}"):
                 raise FileNotFoundError(f"Could not find {orig_defect_name} in the directory {path}.")
 
-        _ = io.parse_energies(defect, path, code, verbose=verbose)
+        _, energies = io.parse_energies(defect, path, code, verbose=verbose, return_energies=True)
         defect_energies_dict = analysis.get_energies(
-            defect_species=defect, output_path=path, verbose=verbose
+            defect_species=defect, output_path=path, verbose=verbose, defect_energies_dict=energies
         )
         defect_structures_dict = analysis.get_structures(
             defect_species=defect, output_path=path, code=code
@@ -951,50 +996,47 @@ def analyse(defect, path, code, ref_struct, verbose):
             defect_energies_dict=defect_energies_dict,
             ref_structure=ref_struct,
         )
-        dataframe.to_csv(f"{path}/{defect}/{defect}.csv")  # change name to results.csv?
-        print(f"Saved results to {path}/{defect}/{defect}.csv")
+        csv_path = f"{path}/{defect}/{defect}.csv"  # change name to results.csv?
+        dataframe.to_csv(csv_path)
+        print(f"Saved results to {csv_path}")
 
     if (
         defect is None
+        and path == "."
         and _running_in_defect_dir(
             path=path,
             warning_substring="calculations will only be analysed for the distortion folders in this "
             "directory.",
         )
-        and path == "."
     ):
         # assume current directory is the defect folder
         cwd = os.getcwd()
-        defect = cwd.split("/")[-1]
-        path = cwd.rsplit("/", 1)[0]
+        defect = os.path.basename(cwd)
+        path = os.path.dirname(cwd)
 
     if defect is None:  # then all
         defect_dirs = _parse_defect_dirs(path)
         for defect in defect_dirs:
             print(f"\nAnalysing {defect}...")
             analyse_single_defect(defect, path, code, ref_struct, verbose)
+        return
 
     defect = defect.strip("/")  # Remove trailing slash if present
-    # Check if defect present in path:
     if path == ".":
         path = os.getcwd()
-    if defect == os.path.basename(os.path.normpath(path)):  # remove defect from end of path if present:
-        orig_path = path
-        path = os.path.dirname(path)
-    else:
-        orig_path = None
+    error_message = (
+        f"Could not analyse defect '{defect}' in directory '{path}'. Please either specify a "
+        f"defect to analyse (with option --defect), run from within a single defect directory "
+        f"(without setting --defect) or run from the top-level directory to "
+        f"analyse all defects in the specified/current directory."
+    )
+    defect_parent_dir = _get_defect_parent_dir(defect, path)
+    if defect_parent_dir is None:
+        raise FileNotFoundError(error_message)
     try:
-        analyse_single_defect(defect, path, code, ref_struct, verbose)
-    except Exception:
-        try:
-            analyse_single_defect(defect, orig_path, code, ref_struct, verbose)
-        except Exception as exc:
-            raise Exception(
-                f"Could not analyse defect '{defect}' in directory '{path}'. Please either specify a "
-                f"defect to analyse (with option --defect), run from within a single defect directory "
-                f"(without setting --defect) or run from the top-level directory to "
-                f"analyse all defects in the specified/current directory."
-            ) from exc
+        analyse_single_defect(defect, defect_parent_dir, code, ref_struct, verbose)
+    except Exception as exc:
+        raise Exception(error_message) from exc
 
 
 @snb.command(
@@ -1002,15 +1044,7 @@ def analyse(defect, path, code, ref_struct, verbose):
     context_settings=CONTEXT_SETTINGS,
     no_args_is_help=False,  # can be run within defect directory with no options/arguments set
 )
-@click.option(
-    "--defect",
-    "-d",
-    help="Name of defect species (folder) to analyse and plot (e.g. 'vac_1_Cd_0'), if run from "
-    "top-level directory or above. Default is current directory name (assumes running from "
-    "within defect folder).",
-    type=str,
-    default=None,
-)
+@_defect_option
 @click.option(
     "--min_energy",
     "-min",
@@ -1021,22 +1055,8 @@ def analyse(defect, path, code, ref_struct, verbose):
     type=float,
     show_default=True,
 )
-@click.option(
-    "--path",
-    "-p",
-    help="Path to the top-level directory containing the defect folder(s). "
-    "Defaults to current directory.",
-    type=click.Path(exists=True, dir_okay=True),
-    default=".",
-)
-@click.option(
-    "--code",
-    help="Code used to run the geometry optimisations. "
-    "Options: 'vasp', 'cp2k', 'espresso', 'castep', 'fhi-aims'.",
-    type=str,
-    default="vasp",
-    show_default=True,
-)
+@_defects_path_option
+@_code_option
 @click.option(
     "--colorbar",
     "-cb",
@@ -1128,36 +1148,44 @@ def plot(
     Can be run within a single defect folder, or in the top-level directory
     (either specifying ``defect`` or looping through all defect folders).
     """
+    from shakenbreak import analysis, io, plotting
+
     if style_file is None:
         style_file = f"{os.path.dirname(os.path.abspath(__file__))}/shakenbreak.mplstyle"
 
     if (
         defect is None
+        and path == "."
         and _running_in_defect_dir(
             path=path,
             warning_substring="calculations will only be analysed and plotted for the distortion folders "
             "in this directory.",
         )
-        and path == "."
     ):
         # assume current directory is the defect folder
         cwd = os.getcwd()
-        defect = cwd.split("/")[-1]
-        path = cwd.rsplit("/", 1)[0]
+        defect = os.path.basename(cwd)
+        path = os.path.dirname(cwd)
 
     if defect is None:  # then all
         defect_dirs = _parse_defect_dirs(path)
-        for defect in defect_dirs:
-            if verbose:
-                print(f"Parsing {defect}...")
-            _ = io.parse_energies(defect, path, code, verbose=verbose)
+        if verbose:
+            print("\n".join(f"Parsing {defect}..." for defect in defect_dirs))
+        parsed_energies = _parse_energies_of_defects(
+            defect_dirs, path, code, verbose=verbose, return_energies=True
+        )
+        energies_dicts = {  # only for defects with energies files written, to reuse in plotting
+            defect: energies
+            for defect, (energies_file, energies) in zip(defect_dirs, parsed_energies)
+            if energies_file is not None and os.path.exists(energies_file)
+        }
         # Create defects_dict (matching defect name to charge states)
-        defects_wout_charge = [defect.rsplit("_", 1)[0] for defect in defect_dirs]
-        defects_dict = {defect_wout_charge: [] for defect_wout_charge in defects_wout_charge}
+        defects_dict = defaultdict(list)
         for defect in defect_dirs:
-            defects_dict[defect.rsplit("_", 1)[0]].append(int(defect.rsplit("_", 1)[1]))
+            defect_wout_charge, _, charge = defect.rpartition("_")
+            defects_dict[defect_wout_charge].append(int(charge))
         return plotting.plot_all_defects(
-            defect_charges_dict=defects_dict,
+            defect_charges_dict=dict(defects_dict),
             output_path=path,
             add_colorbar=colorbar,
             metric=metric,
@@ -1169,29 +1197,33 @@ def plot(
             verbose=verbose,
             style_file=style_file,
             close_figures=True,  # reduce memory usage with snb-plot with many defects at once
+            energies_dicts=energies_dicts,
         )
 
     defect = defect.strip("/")  # Remove trailing slash if present
-    # Check if defect present in path:
     if path == ".":
         path = os.getcwd()
-    if defect == os.path.basename(os.path.normpath(path)):  # remove defect from end of path if present:
-        orig_path = path
-        path = os.path.dirname(path)
-    else:
-        orig_path = None
+    error_message = (
+        f"Could not analyse & plot defect '{defect}' in directory '{path}'. Please either "
+        f"specify a defect to analyse (with option --defect), run from within a single "
+        f"defect directory (without setting --defect) or run from the top-level directory to "
+        f"analyse all defects in the specified/current directory."
+    )
+    defect_parent_dir = _get_defect_parent_dir(defect, path)
+    if defect_parent_dir is None:
+        raise FileNotFoundError(error_message)
     try:
-        energies_file = io.parse_energies(defect, path, code, verbose=verbose)
-        defect_species = energies_file.rsplit("/", 1)[-1].replace(".yaml", "")  # in case '+' removed
+        energies_file = io.parse_energies(defect, defect_parent_dir, code, verbose=verbose)
+        defect_species = os.path.basename(energies_file).replace(".yaml", "")  # in case '+' removed
         defect_energies_dict = analysis.get_energies(
             defect_species=defect_species,
-            output_path=path,
+            output_path=defect_parent_dir,
             verbose=verbose,
         )
         plotting.plot_defect(
             defect_species=defect_species,
             energies_dict=defect_energies_dict,
-            output_path=path,
+            output_path=defect_parent_dir,
             add_colorbar=colorbar,
             metric=metric,
             save_format=format,
@@ -1201,35 +1233,8 @@ def plot(
             style_file=style_file,
             verbose=verbose,
         )
-    except Exception:
-        try:
-            energies_file = io.parse_energies(defect, orig_path, code, verbose=verbose)
-            defect_species = energies_file.rsplit("/", 1)[-1].replace(".yaml", "")  # in case '+' removed
-            defect_energies_dict = analysis.get_energies(
-                defect_species=defect_species,
-                output_path=orig_path,
-                verbose=verbose,
-            )
-            plotting.plot_defect(
-                defect_species=defect_species,
-                energies_dict=defect_energies_dict,
-                output_path=orig_path,
-                add_colorbar=colorbar,
-                metric=metric,
-                save_format=format,
-                units=units,
-                add_title=not no_title,
-                max_energy_above_unperturbed=max_energy,
-                style_file=style_file,
-                verbose=verbose,
-            )
-        except Exception as exc:
-            raise Exception(
-                f"Could not analyse & plot defect '{defect}' in directory '{path}'. Please either "
-                f"specify a defect to analyse (with option --defect), run from within a single "
-                f"defect directory (without setting --defect) or run from the top-level directory to "
-                f"analyse all defects in the specified/current directory."
-            ) from exc
+    except Exception as exc:
+        raise Exception(error_message) from exc
 
 
 @snb.command(
@@ -1290,7 +1295,16 @@ def plot(
     is_flag=True,
     show_default=True,
 )
-def regenerate(path, code, filename, min_energy, metastable, verbose):
+@click.option(
+    "--jobs",
+    "-j",
+    help="Number of parallel processes to use for screening the different defects "
+    "(the structure comparisons are CPU-bound). 0 uses all available CPU cores.",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+)
+def regenerate(path, code, filename, min_energy, metastable, verbose, jobs):
     """
     Identify defect species undergoing energy-lowering distortions and
     test these distortions for the other charge states of the defect.
@@ -1299,6 +1313,8 @@ def regenerate(path, code, filename, min_energy, metastable, verbose):
     found for multiple charge states. Defect folder names should end with
     charge state after an underscore (e.g. ``vac_1_Cd_0`` or ``Va_Cd_0`` etc).
     """
+    from shakenbreak import energy_lowering_distortions
+
     if path == ".":
         path = os.getcwd()  # more verbose error if no defect folders found in path
     defect_charges_dict = energy_lowering_distortions.read_defects_directories(output_path=path)
@@ -1308,37 +1324,49 @@ def regenerate(path, code, filename, min_energy, metastable, verbose):
             f"directory contains defect folders with names ending in a charge "
             f"state after an underscore (e.g. `vac_1_Cd_0` or `Va_Cd_0` etc)."
         )
-    _ = energy_lowering_distortions.get_energy_lowering_distortions(
-        defect_charges_dict=defect_charges_dict,
-        output_path=path,
-        code=code,
-        structure_filename=filename,
-        write_input_files=True,
-        min_e_diff=min_energy,
-        metastable=metastable,
-        verbose=verbose,
-    )
+    regenerate_kwargs = {
+        "output_path": path,
+        "code": code,
+        "structure_filename": filename,
+        "write_input_files": True,
+        "min_e_diff": min_energy,
+        "metastable": metastable,
+        "verbose": verbose,
+    }
+    max_workers = min(jobs or os.cpu_count() or 1, len(defect_charges_dict))
+    if max_workers <= 1:
+        _ = energy_lowering_distortions.get_energy_lowering_distortions(
+            defect_charges_dict=defect_charges_dict, **regenerate_kwargs
+        )
+        return
+
+    # distortions are only compared/pruned across charge states of the same defect, so each
+    # defect can be screened independently in a separate process:
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                energy_lowering_distortions.get_energy_lowering_distortions,
+                defect_charges_dict={defect: charges},
+                **regenerate_kwargs,
+            )
+            for defect, charges in defect_charges_dict.items()
+        ]
+        for future in futures:
+            future.result()  # re-raise any errors from the worker processes
 
 
 def _running_in_defect_dir(path: str = ".", warning_substring: str = ""):
     warning_substring = warning_substring or (
         "the groundstate structure from the distortion folders in this directory will be generated."
     )
-    if any(
-        dir
-        for dir in os.listdir()
-        if os.path.isdir(dir)
-        and any(substring in dir for substring in ["Bond_Distortion", "Rattled", "Unperturbed", "Dimer"])
-    ):  # distortion subfolders in cwd
-        # check if defect folders also in cwd
-        for dir in [dir for dir in os.listdir() if os.path.isdir(dir)]:
-            defect_name = None
-            try:
-                defect_name = format_defect_name(dir, include_site_info_in_name=False)
-            except Exception:
-                with contextlib.suppress(Exception):
-                    defect_name = format_defect_name(f"{dir}_0", include_site_info_in_name=False)
-            if defect_name:  # recognised defect folder found in cwd, warn user and proceed
+    with os.scandir() as entries:  # list cwd once, reusing the cached directory checks
+        cwd_dirs = [entry.name for entry in entries if entry.is_dir()]
+    distortion_dirs = {dir for dir in cwd_dirs if _DISTORTION_RE.search(dir)}
+    if distortion_dirs:  # distortion subfolders in cwd
+        # check if defect folders also in cwd (skipping distortion folders, which aren't defect names)
+        for dir in cwd_dirs:
+            if dir not in distortion_dirs and _format_defect_name_or_none(dir):
+                # recognised defect folder found in cwd, warn user and proceed
                 # assuming they want to just parse the distortion folders in cwd
                 warnings.warn(
                     f"Both distortion folders and defect folders (i.e. {dir}) were found in the current "
@@ -1412,16 +1440,13 @@ def groundstate(
     (e.g. geometry optimisations performed with VASP). If using a different code,
     please specify the name of the structure/output files.
     """
+    from shakenbreak import energy_lowering_distortions
+
     # determine if running from within a defect directory or from the top level directory
-    if (
-        _running_in_defect_dir(
-            path,
-            warning_substring=(
-                "the groundstate structure from the distortion folders in this directory will be "
-                "generated."
-            ),
-        )
-        and path == "."
+    if path == "." and _running_in_defect_dir(
+        path,
+        warning_substring="the groundstate structure from the distortion folders in this directory will "
+        "be generated.",
     ):
         energy_lowering_distortions.write_groundstate_structure(
             all=False,
@@ -1444,6 +1469,50 @@ def groundstate(
     )
 
 
+# gzip, xz and bz2 file signatures:
+_COMPRESSION_MAGIC_NUMBERS = (b"\x1f\x8b", b"\xfd7zXZ", b"BZh")
+
+
+def _get_final_abs_magnetization(outcar: str) -> Optional[list]:
+    """
+    Get the absolute total magnetisation of each atom from the final
+    ``magnetization (x)`` block of an (uncompressed) ``VASP`` ``OUTCAR``,
+    memory-mapping the file and searching backwards from the end rather
+    than parsing the whole (often very large) ``OUTCAR``.
+
+    Returns ``None`` if the file is compressed or from a non-collinear
+    calculation (in which case the full ``Outcar`` parser should be used),
+    or an empty list if no magnetisation block is present.
+    """
+    if os.path.splitext(outcar)[1].lower() in {".gz", ".xz", ".bz2", ".lzma", ".z"}:
+        return None
+
+    with open(outcar, "rb") as f:
+        if f.read(6).startswith(_COMPRESSION_MAGIC_NUMBERS):  # compressed, without the extension
+            return None
+        if not f.seek(0, os.SEEK_END):  # empty file, can't be memory-mapped
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            idx = mm.rfind(b" magnetization (x)")
+            if idx == -1:
+                return []
+            block = mm[idx:]
+
+    if b"magnetization (y)" in block:  # non-collinear (SOC) calculation
+        return None
+
+    abs_mag_values = []
+    for line in block.decode("utf-8", errors="replace").splitlines()[1:]:
+        tokens = line.split()
+        if not tokens or tokens[0].startswith("-") or tokens[0] == "#":  # blank, divider or header
+            continue
+        if not tokens[0].isdigit():  # end of block ("tot" line)
+            break
+        abs_mag_values.append(abs(float(tokens[-1])))
+
+    return abs_mag_values
+
+
 @snb.command(
     name="mag",
     context_settings=CONTEXT_SETTINGS,
@@ -1480,8 +1549,11 @@ def mag(outcar, threshold, verbose):
     Returns a shell exit status of 0 if magnetisation is below the threshold and 1 if above.
     """
     try:
-        outcar_obj = get_outcar(outcar)
-        abs_mag_values = [abs(m["tot"]) for m in outcar_obj.magnetization]
+        abs_mag_values = _get_final_abs_magnetization(outcar)
+        if abs_mag_values is None:  # compressed or non-collinear OUTCAR, use full parser
+            from doped.utils.parsing import get_outcar
+
+            abs_mag_values = [abs(m["tot"]) for m in get_outcar(outcar).magnetization]
 
         if (
             max(abs_mag_values) < threshold  # no one atomic moment greater than threshold
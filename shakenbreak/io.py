@@ -19,6 +19,9 @@ from pymatgen.io.ase import AseAtomsAdaptor
 
 aaa = AseAtomsAdaptor()
 
+_ESPRESSO_ALIASES = frozenset({"espresso", "quantum_espresso", "quantum-espresso", "quantumespresso"})
+_FHI_AIMS_ALIASES = frozenset({"fhi-aims", "fhi_aims", "fhiaims"})
+
 
 def parse_energies(
     defect: str,
@@ -26,7 +29,8 @@ def parse_energies(
     code: Optional[str] = "vasp",
     filename: Optional[str] = "OUTCAR",
     verbose: bool = False,
-) -> None:
+    return_energies: bool = False,
+) -> Union[str, tuple]:
     """
     Parse final energy for all distortions present in the given defect
     directory and write them to a ``yaml`` file in the defect directory.
@@ -52,10 +56,16 @@ def parse_energies(
         verbose (:obj:`bool`):
             If True, print information about renamed/saved-over files.
             Defaults to False.
+        return_energies (:obj:`bool`):
+            If True, also return the parsed energies dictionary (as written
+            to the ``energies_file``), to avoid having to re-read it.
+            Defaults to False.
 
     Returns:
         :obj:`str`:
-            Path to the ``energies_file``.
+            Path to the ``energies_file``, or tuple of the ``energies_file``
+            path and the parsed energies dictionary if ``return_energies`` is True.
+            None (or ``(None, None)``) if the defect folder is not found.
     """
     from shakenbreak.analysis import _format_distortion_names, _sort_data
 
@@ -215,7 +225,7 @@ def parse_energies(
                 f"Defect folder '{orig_defect_name}' not found in '{path}'. Please check these folders "
                 f"and paths."
             )
-            return None
+            return (None, None) if return_energies else None
 
     dist_dirs = [
         dir
@@ -244,24 +254,20 @@ def parse_energies(
         prev_energies_dict = {}
 
     # Parse energies and write them to file
+    code_lower = code.lower()
     for dist in dist_dirs:
         outcar = None
         energy = None
         converged = False
-        if code.lower() == "vasp":
+        if code_lower == "vasp":
             converged, energy, outcar = parse_vasp_energy(defect_dir, dist, energy, outcar)
-        elif code.lower() in [
-            "espresso",
-            "quantum_espresso",
-            "quantum-espresso",
-            "quantumespresso",
-        ]:
+        elif code_lower in _ESPRESSO_ALIASES:
             converged, energy, outcar = parse_espresso_energy(defect_dir, dist, energy, outcar)
-        elif code.lower() == "cp2k":
+        elif code_lower == "cp2k":
             converged, energy, outcar = parse_cp2k_energy(defect_dir, dist, energy, outcar)
-        elif code.lower() == "castep":
+        elif code_lower == "castep":
             converged, energy, outcar = parse_castep_energy(defect_dir, dist, energy, outcar)
-        elif code.lower() in ["fhi-aims", "fhi_aims", "fhiaims"]:
+        elif code_lower in _FHI_AIMS_ALIASES:
             converged, energy, outcar = parse_fhi_aims_energy(defect_dir, dist, energy, outcar)
 
         if _format_distortion_names(dist) != "Label_not_recognized":
@@ -376,6 +382,8 @@ def parse_energies(
     if energies and energies != {"distortions": {}}:
         save_file(energies, defect, path, verbose=verbose)
 
+    if return_energies:
+        return energies_file, energies
     return energies_file
 
 
@@ -8,6 +8,7 @@ import datetime
 import os
 import shutil
 import warnings
+from functools import lru_cache
 from typing import Optional
 
 import matplotlib as mpl
@@ -25,6 +26,29 @@ from shakenbreak import analysis
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+@lru_cache(maxsize=8)
+def _load_style_by_mtime(style_file: str, mtime_ns: int) -> mpl.RcParams:
+    """Parse a ``matplotlib`` style file, cached by path and modification time."""
+    return mpl.rc_params_from_file(style_file, use_default_template=False)
+
+
+def _get_style(style_file: Optional[PathLike] = None):
+    """
+    Get the ``matplotlib`` style to use for plotting (the ``ShakeNBreak`` style
+    if ``style_file`` is None). Style files are only parsed once per session
+    (unless modified), rather than for every plot.
+    """
+    style_file = style_file or f"{MODULE_DIR}/shakenbreak.mplstyle"
+    if (
+        not isinstance(style_file, (str, os.PathLike))
+        or style_file in plt.style.library  # library styles take precedence, as in plt.style.use
+        or style_file == "default"
+        or not os.path.isfile(style_file)
+    ):
+        return style_file  # e.g. name of a matplotlib style, or dict/list of styles
+    return _load_style_by_mtime(os.path.abspath(style_file), os.stat(style_file).st_mtime_ns)
+
+
 def _install_custom_font():
     """Check if SnB custom font has been installed, and install it otherwise."""
     # Find where matplotlib stores its True Type fonts
@@ -40,7 +64,12 @@ def _install_custom_font():
         try:
             # Copy the font file to matplotlib's True Type font directory
             fonts_dir = MODULE_DIR
-            ttf_fonts = [file_name for file_name in os.listdir(fonts_dir) if ".ttf" in file_name]
+            with os.scandir(fonts_dir) as entries:
+                ttf_fonts = [
+                    entry.name
+                    for entry in entries
+                    if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(".ttf")
+                ]
             try:
                 for font in ttf_fonts:  # must be in ttf format for matplotlib
                     old_path = os.path.join(fonts_dir, font)
@@ -815,6 +844,7 @@ def plot_all_defects(
     save_format: str = "png",
     verbose: bool = False,
     close_figures: bool = False,
+    energies_dicts: Optional[dict] = None,
 ) -> dict:
     """
     Convenience function to quickly analyse a range of defects and identify those
@@ -872,6 +902,12 @@ def plot_all_defects(
             Recommended to use if plotting many defects at once, in which case figures will
             be saved to disk and not displayed.
             (Default: False)
+        energies_dicts (:obj:`dict`):
+            Dictionary of {Defect Species (Name & Charge): energies dictionary}, for
+            defect species which have already been parsed (e.g. with
+            ``io.parse_energies(..., return_energies=True)``), in which case their
+            energies files are not re-read.
+            (Default: None)
 
     Returns:
         :obj:`dict`:
@@ -923,12 +959,15 @@ def plot_all_defects(
                     continue
 
             energies_file = f"{output_path}/{defect_species}/{defect_species}.yaml"
-            if not os.path.exists(energies_file):
+            parsed_energies_dict = energies_dicts.get(defect_species) if energies_dicts else None
+            if parsed_energies_dict is None and not os.path.exists(energies_file):
                 warnings.warn(
                     f"Path {energies_file} does not exist. Skipping {defect_species}."
                 )  # skip defect
                 continue
-            energies_dict, energy_diff, _gs_distortion = analysis._sort_data(energies_file, verbose=False)
+            energies_dict, energy_diff, _gs_distortion = analysis._sort_data(
+                energies_file, verbose=False, defect_energies_dict=parsed_energies_dict
+            )
 
             if not energy_diff:  # if Unperturbed calc is not converged, warn user
                 warnings.warn(
@@ -1187,7 +1226,7 @@ def plot_defect(
     else:
         legend_label = "Distortions"
 
-    with plt.style.context(style_file or f"{MODULE_DIR}/shakenbreak.mplstyle"):
+    with plt.style.context(_get_style(style_file)):
         if add_colorbar:
             fig = plot_colorbar(
                 energies_dict=energies_dict,
@@ -1500,7 +1539,7 @@ def plot_colorbar(
             Energy vs distortion plot with colorbar for structural similarity,
             as a ``Figure`` object
     """
-    with plt.style.context(style_file or f"{MODULE_DIR}/shakenbreak.mplstyle"):
+    with plt.style.context(_get_style(style_file)):
         fig, ax = _setup_plot(
             defect_species=defect_species,
             include_site_info_in_name=include_site_info_in_name,
@@ -1685,7 +1724,7 @@ def plot_datasets(
             Energy vs distortion plot for multiple datasets,
             as a ``Figure`` object
     """
-    with plt.style.context(style_file or f"{MODULE_DIR}/shakenbreak.mplstyle"):
+    with plt.style.context(_get_style(style_file)):
         fig, ax = _setup_plot(
             defect_species=defect_species,
             include_site_info_in_name=include_site_info_in_name,
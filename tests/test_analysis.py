@@ -413,6 +413,17 @@ class AnalyseDefectsTestCase(unittest.TestCase):
         np.testing.assert_almost_equal(defect_energies_meV_dict["distortions"][-0.2], -3.605090000007749)
         self.assertEqual(defect_energies_meV_dict["Unperturbed"], 0)
 
+        # test with pre-parsed energies dictionary:
+        defect_energies_dict_from_dict = analysis.get_energies(
+            defect_species="vac_1_Cd_0",
+            output_path=self.VASP_CDTE_DATA_DIR,
+            defect_energies_dict=loadfn(f"{self.VASP_CDTE_DATA_DIR}/vac_1_Cd_0/vac_1_Cd_0.yaml"),
+        )
+        self.assertEqual(
+            defect_energies_dict_from_dict,
+            analysis.get_energies(defect_species="vac_1_Cd_0", output_path=self.VASP_CDTE_DATA_DIR),
+        )
+
         # test if 'Unperturbed' is not present:
         shutil.copy(
             os.path.join(
@@ -1,7 +1,10 @@
+import bz2
 import copy
 import datetime
 import filecmp
+import gzip
 import json
+import lzma
 import os
 import re
 import shutil
@@ -20,9 +23,10 @@ from monty.serialization import loadfn, dumpfn
 from pymatgen.core.structure import Structure
 from pymatgen.io.vasp.inputs import Poscar, UnknownPotcarWarning, Kpoints, Potcar, Incar
 
+from doped.utils.parsing import get_outcar
 from doped.vasp import _test_potcar_functional_choice
 
-from shakenbreak.cli import snb
+from shakenbreak.cli import _get_final_abs_magnetization, snb
 from shakenbreak.distortions import rattle
 from shakenbreak.input import generate_defect_object
 
@@ -112,6 +116,8 @@ class CLITestCase(unittest.TestCase):
             "test_config.yml",
             "job_file",
             "previous_default_rattle_settings.yaml",
+            "mag_test_outcars",
+            "regenerate_jobs_results",
         ]:
             if_present_rm(i)
         if_present_rm("../previous_default_rattle_settings.yaml")
@@ -3339,6 +3345,7 @@ Chosen VASP error message: {error_string}
             os.path.exists(f"{self.EXAMPLE_RESULTS}/pesky_defects/{defect_name}/{defect_name}.csv")
         )
         self.assertTrue(os.path.exists(f"{self.EXAMPLE_RESULTS}/pesky_defects/v_Ti_0/v_Ti_0.csv"))
+        self.assertEqual(result.output.count("Saved results to"), 2)  # each defect analysed once
         shutil.rmtree(f"{self.EXAMPLE_RESULTS}/pesky_defects/")
         # Test non-existent defect
         name = "v_Ti_-2"
@@ -3360,6 +3367,7 @@ Chosen VASP error message: {error_string}
             f"analyse all defects in the specified/current directory.",
             str(result.exception),
         )
+        self.assertIsInstance(result.exception, FileNotFoundError)
 
         # Test when `defect` is present higher up in `path`
         defect = "v_Ti_0"
@@ -3741,6 +3749,47 @@ Chosen VASP error message: {error_string}
             if "yaml" in file
         ]
 
+    def test_regenerate_jobs(self):
+        """Test regenerate() with defects screened in parallel processes"""
+
+        def _get_regenerated_files(output_path):
+            regenerated_files = {}
+            for defect in os.listdir(output_path):
+                if not os.path.isdir(f"{output_path}/{defect}"):
+                    continue
+                for dir in os.listdir(f"{output_path}/{defect}"):
+                    if "_from_" in dir:
+                        for file in os.listdir(f"{output_path}/{defect}/{dir}"):
+                            regenerated_file_path = f"{output_path}/{defect}/{dir}/{file}"
+                            regenerated_files[f"{defect}/{dir}/{file}"] = regenerated_file_path
+            return regenerated_files
+
+        jobs_output_path = os.path.join(os.path.dirname(__file__), "regenerate_jobs_results")
+        shutil.copytree(self.EXAMPLE_RESULTS, jobs_output_path)
+        runner = CliRunner()
+        for output_path, jobs_args in [(self.EXAMPLE_RESULTS, []), (jobs_output_path, ["-j", "2"])]:
+            result = runner.invoke(
+                snb, ["regenerate", "-p", output_path, *jobs_args], catch_exceptions=False
+            )
+            self.assertEqual(result.exit_code, 0)
+
+        serial_files = _get_regenerated_files(self.EXAMPLE_RESULTS)
+        jobs_files = _get_regenerated_files(jobs_output_path)
+        for defect_dir in [
+            "v_Cd_0/Bond_Distortion_20.0%_from_-1",
+            "v_Cd_-2/Bond_Distortion_20.0%_from_-1",
+            "v_Cd_-1/Bond_Distortion_-60.0%_from_0",
+        ]:
+            self.assertIn(f"{defect_dir}/POSCAR", jobs_files)
+        self.assertEqual(sorted(serial_files), sorted(jobs_files))
+        for file, serial_file_path in serial_files.items():
+            self.assertTrue(filecmp.cmp(serial_file_path, jobs_files[file], shallow=False))
+
+        # negative numbers of jobs are rejected:
+        result = runner.invoke(snb, ["regenerate", "-p", jobs_output_path, "-j", "-1"])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn("-1 is not in the range x>=0", result.output)
+
     def test_regenerate(self):
         """Test regenerate() function"""
         with warnings.catch_warnings(record=True) as w:
@@ -4133,6 +4182,104 @@ Chosen VASP error message: {error_string}
         self.assertIn("Magnetisation is below threshold (<1.0 μB/atom)", result.output)
         self.assertEqual(result.exit_code, 0)
 
+    def test_get_final_abs_magnetization(self):
+        """Test parsing the final magnetisation block of OUTCARs, used by snb-mag"""
+
+        def _get_abs_mag_values(outcar):  # reference values from the full pymatgen parser
+            return [abs(m["tot"]) for m in get_outcar(outcar).magnetization]
+
+        # OUTCARs with several magnetisation blocks (one per ionic step); only the last one counts:
+        for outcar in [
+            f"{self.EXAMPLE_RESULTS}/v_Ti_0/Unperturbed/OUTCAR",
+            f"{self.EXAMPLE_RESULTS}/v_Ti_0/Bond_Distortion_-40.0%/OUTCAR",
+            f"{self.VASP_DIR}/v_O_s1_0/Bond_Distortion_-50.0%/OUTCAR",
+        ]:
+            with open(outcar) as f:
+                self.assertGreater(f.read().count(" magnetization (x)"), 1)
+            abs_mag_values = _get_final_abs_magnetization(outcar)
+            self.assertTrue(abs_mag_values)
+            self.assertEqual(abs_mag_values, _get_abs_mag_values(outcar))
+
+        os.mkdir("mag_test_outcars")
+        outcar = f"{self.EXAMPLE_RESULTS}/v_Ti_0/Unperturbed/OUTCAR"
+        with open(outcar) as f:
+            outcar_text = f.read()
+        last_block_idx = outcar_text.rfind(" magnetization (x)")
+        last_block_end_idx = outcar_text.index("\n", outcar_text.index("\ntot ", last_block_idx) + 1)
+        last_block = outcar_text[last_block_idx:last_block_end_idx]
+
+        # OUTCAR with f-orbital column:
+        f_orbital_block_lines = []
+        for line in last_block.splitlines():
+            if line.startswith("# of ion"):
+                line = "# of ion       s       p       d       f       tot"
+            elif line.split() and (line.split()[0].isdigit() or line.startswith("tot")):
+                line = f"{line[:-8]}   0.500{line[-8:]}"  # add f column before total
+            f_orbital_block_lines.append(line)
+        with open("mag_test_outcars/OUTCAR_f", "w") as f:
+            f.write(
+                outcar_text[:last_block_idx]
+                + "\n".join(f_orbital_block_lines)
+                + outcar_text[last_block_end_idx:]
+            )
+        self.assertEqual(get_outcar("mag_test_outcars/OUTCAR_f").magnetization[0]["f"], 0.5)
+        self.assertEqual(
+            _get_final_abs_magnetization("mag_test_outcars/OUTCAR_f"),
+            _get_abs_mag_values("mag_test_outcars/OUTCAR_f"),
+        )
+
+        # compressed OUTCAR, falls back to the full parser:
+        with open(outcar, "rb") as f_in, gzip.open("mag_test_outcars/OUTCAR.gz", "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        self.assertIsNone(_get_final_abs_magnetization("mag_test_outcars/OUTCAR.gz"))
+        self.assertEqual(
+            _get_abs_mag_values("mag_test_outcars/OUTCAR.gz"), _get_final_abs_magnetization(outcar)
+        )
+
+        # compressed OUTCARs without the file extension are detected from their magic bytes:
+        shutil.copyfile("mag_test_outcars/OUTCAR.gz", "mag_test_outcars/OUTCAR_gzipped")
+        with bz2.open("mag_test_outcars/OUTCAR_bzipped", "wb") as f_out:
+            f_out.write(outcar_text.encode())
+        with lzma.open("mag_test_outcars/OUTCAR_xzipped", "wb") as f_out:
+            f_out.write(outcar_text.encode())
+        for compressed_outcar in ["OUTCAR_gzipped", "OUTCAR_bzipped", "OUTCAR_xzipped"]:
+            self.assertIsNone(_get_final_abs_magnetization(f"mag_test_outcars/{compressed_outcar}"))
+        shutil.copyfile("mag_test_outcars/OUTCAR_gzipped", "mag_test_outcars/OUTCAR_gzipped.gz")
+        self.assertEqual(
+            _get_abs_mag_values("mag_test_outcars/OUTCAR_gzipped.gz"), _get_final_abs_magnetization(outcar)
+        )
+
+        # non-collinear (SOC) OUTCAR, falls back to the full parser:
+        with open("mag_test_outcars/OUTCAR_soc", "w") as f:
+            f.write(
+                outcar_text[:last_block_end_idx].replace("LSORBIT =      F", "LSORBIT =      T")
+                + f"\n\n{last_block.replace('(x)', '(y)')}\n\n{last_block.replace('(x)', '(z)')}"
+                + outcar_text[last_block_end_idx:]
+            )
+        self.assertIsNone(_get_final_abs_magnetization("mag_test_outcars/OUTCAR_soc"))
+        runner = CliRunner()
+        abs_mag_values = _get_abs_mag_values("mag_test_outcars/OUTCAR_soc")
+        self.assertAlmostEqual(max(abs_mag_values), 1.318, places=3)
+        for threshold, exit_code in [(1, 1), (2, 0)]:
+            result = runner.invoke(
+                snb,
+                ["mag", "-o", "mag_test_outcars/OUTCAR_soc", "-t", str(threshold)],
+                catch_exceptions=False,
+            )
+            self.assertEqual(result.exit_code, exit_code)
+
+        # empty OUTCAR and OUTCAR without magnetisation blocks (e.g. ISPIN = 1), which the full parser
+        # also can't parse magnetisation from:
+        open("mag_test_outcars/OUTCAR_empty", "w").close()
+        for outcar in ["mag_test_outcars/OUTCAR_empty", f"{self.VASP_DIR}/v_Ge_s16_0/Unperturbed/OUTCAR"]:
+            self.assertEqual(_get_final_abs_magnetization(outcar), [])
+            self.assertRaises(IndexError, get_outcar, outcar)
+            result = runner.invoke(snb, ["mag", "-v", "-o", outcar], catch_exceptions=False)
+            self.assertIn(f"Could not read magnetisation from OUTCAR file at {outcar}", result.output)
+            self.assertEqual(result.exit_code, 1)
+
+        if_present_rm("mag_test_outcars")
+
 
 if __name__ == "__main__":
     unittest.main()
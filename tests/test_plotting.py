@@ -311,6 +311,27 @@ class PlottingDefectsTestCase(unittest.TestCase):
             "vac_1_Cd_0",
         )
 
+    def test_get_style(self):
+        """Test _get_style() function."""
+        # style files are parsed (once) to rcParams, defaulting to the ShakeNBreak style:
+        style = plotting._get_style()
+        self.assertIsInstance(style, mpl.RcParams)
+        self.assertEqual(style, plotting._get_style(STYLE))
+        self.assertIs(plotting._get_style(), style)  # cached
+
+        # matplotlib style names, dicts and lists of styles are passed through:
+        for style in ["ggplot", {"lines.linewidth": 3.0}, ["ggplot", {"lines.linewidth": 3.0}]]:
+            self.assertIs(plotting._get_style(style), style)
+            with plt.style.context(plotting._get_style(style)):
+                self.assertEqual(mpl.rcParams["lines.linewidth"], 3.0 if style != "ggplot" else 1.5)
+
+        # library style names take precedence over files of the same name, as in plt.style.use:
+        for style in ["ggplot", "default"]:
+            with open(style, "w") as f:
+                f.write("lines.linewidth: 7.0")
+            self.assertIs(plotting._get_style(style), style)
+            if_present_rm(style)
+
     def test_change_energy_units_to_meV(self):
         """Test _change_energy_units_to_meV() function."""
         # Test standard behaviour
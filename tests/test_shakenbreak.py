@@ -516,6 +516,18 @@ class ShakeNBreakTestCase(unittest.TestCase):  # integration testing ShakeNBreak
         energies = loadfn(energies_file)
         self.assertTrue(-0.35 in energies["distortions"])
         self.assertFalse(-0.77 in energies["distortions"])
+        # returned energies dict should match that written to file:
+        self.assertEqual(
+            io.parse_energies(defect=defect_dir, path="./", return_energies=True),
+            (energies_file, energies),
+        )
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.assertEqual(
+                io.parse_energies(defect="does_not_exist_1", path="./", return_energies=True),
+                (None, None),
+            )
+        self.assertTrue(any("Defect folder 'does_not_exist_1' not found" in str(i.message) for i in w))
 
         defect_charges_dict = energy_lowering_distortions.read_defects_directories()
         defect_charges_dict.pop("vac_1_Ti", None)  # Used for magnetization tests